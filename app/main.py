@@ -1,18 +1,27 @@
 import uvicorn
+import asyncio
+import contextlib
+import hashlib
 import tempfile
 import os
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import FileResponse
+import sys
+from pathlib import Path
+from typing import Optional
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from app.config.settings import get_settings
 from app.services.finance_service import FinanceService
 from app.services.excel_service import ExcelService
-from app.models.response_models import QueryResponse, HealthResponse
+from app.models.response_models import FinancialModelRequest, QueryResponse, HealthResponse
 
 app = FastAPI(
     title="Autonomous Strategic Finance API",
     description="AI-powered financial modeling and forecasting",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson encodes the large per-month projection payloads much faster than the stdlib json module
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -24,17 +33,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# The frontend page is static, so it is read once at startup and served from memory
+INDEX_HTML = Path("app/static/index.html").read_bytes()
+INDEX_ETAG = f'"{hashlib.blake2b(INDEX_HTML, digest_size=16).hexdigest()}"'
+
 # Initialize services
 finance_service = FinanceService()
 excel_service = ExcelService()
 
+@app.on_event("startup")
+async def open_llm_client():
+    """Open the persistent LLM connection in the background so startup is not held up by the SDK import"""
+    app.state.llm_warmup = asyncio.create_task(finance_service.llm_service.connect())
+
+@app.on_event("shutdown")
+async def close_llm_client():
+    """Stop the warm-up if it is still running, then close the persistent LLM connection"""
+    warmup = getattr(app.state, "llm_warmup", None)
+    if warmup is not None and not warmup.done():
+        warmup.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await warmup
+    await finance_service.llm_service.aclose()
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against the current ETag of a resource"""
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]
+
 @app.get("/")
-async def serve_frontend():
+async def serve_frontend(if_none_match: Optional[str] = Header(None)):
     """Serve the frontend application"""
-    return FileResponse("app/static/index.html")
+    if _etag_matches(if_none_match, INDEX_ETAG):
+        return Response(status_code=304, headers={"ETag": INDEX_ETAG})
+    return Response(
+        content=INDEX_HTML,
+        media_type="text/html",
+        headers={"ETag": INDEX_ETAG, "Cache-Control": "public, max-age=60"}
+    )
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
@@ -43,61 +85,94 @@ async def health_check():
     """
     return HealthResponse(status="healthy", message="Autonomous Finance API is running")
 
-@app.get("/api/v1/search", response_model=QueryResponse)
-async def search_financial_model(
-    query: str = Query(..., description="Natural language query for financial modeling")
-):
+@app.post("/api/v1/search", response_model=QueryResponse)
+async def search_financial_model(request: FinancialModelRequest):
     """
     Process natural language query and return financial model structure.
+    The query is sent as a JSON body ({"user_query": "..."}) so long prose needs no URL encoding.
     Example: "Create 12-month revenue forecast with 2 sales people, marketing spend $200k/month"
     """
     try:
-        result = await finance_service.process_query(query)
-        return result
+        result = await finance_service.process_query(request.user_query)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error processing query: {str(e)}")
 
+    # The result is already a validated QueryResponse; serializing it with pydantic-core directly
+    # skips FastAPI's response re-validation and jsonable_encoder pass. response_model still documents it.
+    return Response(content=result.model_dump_json(), media_type="application/json")
+
 @app.get("/api/v1/export/excel/{model_id}")
-async def export_excel(model_id: str, auto_open: bool = Query(False, description="If true (macOS), open the file after generating")):
-    """Export financial model to Excel format"""
+def export_excel(
+    model_id: str,
+    auto_open: bool = Query(False, description="If true, open the file locally after generating (debug mode only)"),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Export financial model to Excel format.
+    Declared with plain def because workbook generation is blocking; FastAPI runs it in its threadpool.
+    """
     try:
         # Get model data
         model_data = finance_service.get_model_by_id(model_id)
         if not model_data:
-            raise HTTPException(status_code=404, detail="Model not found")
+            raise HTTPException(
+                status_code=404,
+                detail="Model not found or expired; models are kept for one hour, run the search again"
+            )
 
-        # Generate Excel file
-        excel_data = excel_service.generate_excel(model_data)
+        # Generate Excel file (cached per model)
+        excel_data, etag = excel_service.generate_excel_cached(model_id, model_data)
 
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-            tmp_file.write(excel_data)
-            tmp_file_path = tmp_file.name
+        # Let clients reuse a download they already have
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
 
-        # Optionally open the file locally (useful during demos on macOS)
-        if auto_open:
-            try:
-                if os.uname().sysname == 'Darwin':
-                    os.system(f"open '{tmp_file_path}'")
-                elif os.uname().sysname == 'Linux':
-                    os.system(f"xdg-open '{tmp_file_path}' >/dev/null 2>&1 &")
-                # On Windows, you could use: os.startfile(tmp_file_path)
-            except Exception:
-                # Ignore auto-open failures and still return the file
-                pass
-
-        return FileResponse(
-            path=tmp_file_path,
-            filename=f"financial_model_{model_id}.xlsx",
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        # Optionally open a local copy (useful during demos); only honoured in debug mode
+        if auto_open and get_settings().debug:
+            _open_locally(excel_data)
+
+        # Send the in-memory workbook directly, no temporary file needed
+        return Response(
+            content=excel_data,
+            media_type=XLSX_MEDIA_TYPE,
+            headers={
+                "Content-Disposition": f'attachment; filename="financial_model_{model_id}.xlsx"',
+                "ETag": etag
+            }
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating Excel: {str(e)}")
 
+def _open_locally(excel_data: bytes):
+    """Write the workbook to a temporary file and open it with the desktop viewer"""
+    try:
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
+            tmp_file.write(excel_data)
+            tmp_file_path = tmp_file.name
+
+        if os.uname().sysname == 'Darwin':
+            os.system(f"open '{tmp_file_path}'")
+        elif os.uname().sysname == 'Linux':
+            os.system(f"xdg-open '{tmp_file_path}' >/dev/null 2>&1 &")
+        # On Windows, you could use: os.startfile(tmp_file_path)
+    except Exception:
+        # Ignore auto-open failures and still return the file
+        pass
+
 @app.get("/api/v1/revenue-drivers")
 async def get_revenue_drivers():
     """Get available revenue drivers from knowledge base"""
     return finance_service.get_available_revenue_drivers()
 
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    # uvicorn[standard] installs httptools everywhere and uvloop everywhere except Windows
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=True,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools"
+    )
\ No newline at end of file
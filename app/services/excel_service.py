@@ -1,111 +1,227 @@
+import hashlib
 import io
-import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment
-from typing import Any, List
-from app.models.finance_models import FinancialModel
+import threading
+import numpy as np
+from cachetools import LRUCache
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+from app.models.finance_models import FinancialModel, MonthlyProjection
+
+if TYPE_CHECKING:
+    from openpyxl.styles.cell_style import StyleArray
+
+HEADER_STYLE = "header"
+VALUE_STYLE = "value"
+
+# Month columns hold short numbers, so they get a fixed width instead of a per-cell scan
+MAX_COLUMN_WIDTH = 50
+VALUE_COLUMN_WIDTH = 14
+
+# Upper bound on the total size of cached workbooks
+EXCEL_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Column layout used to unpack the projections in a single pass
+PROJECTION_DTYPE = np.dtype([
+    ("sales_people", np.int64),
+    ("large_customers_acquired", np.int64),
+    ("large_customers_cumulative", np.int64),
+    ("large_customer_revenue", np.float64),
+    ("marketing_spend", np.float64),
+    ("small_customers_acquired", np.int64),
+    ("small_customers_cumulative", np.int64),
+    ("small_customer_revenue", np.float64),
+    ("total_revenue", np.float64),
+])
+
+
+@lru_cache(maxsize=1)
+def _style_components() -> Tuple[Any, Any, Any, Any]:
+    """
+    Imports openpyxl on the first export and builds the header font, header fill,
+    header alignment and centered alignment. They are immutable, so every workbook
+    shares them.
+    """
+    from openpyxl.styles import Font, PatternFill, Alignment
+    return (
+        Font(bold=True, color="FFFFFF"),
+        PatternFill(start_color="366092", end_color="366092", fill_type="solid"),
+        Alignment(horizontal="center", vertical="center"),
+        Alignment(horizontal="center"),
+    )
+
+
+def _projections_to_soa(projections: List[MonthlyProjection]) -> Dict[str, np.ndarray]:
+    """
+    Converts the per-month projection objects into one NumPy array per field.
+    """
+    arr = np.fromiter(
+        (
+            (
+                p.sales_people,
+                p.large_customers_acquired,
+                p.large_customers_cumulative,
+                p.large_customer_revenue,
+                p.marketing_spend,
+                p.small_customers_acquired,
+                p.small_customers_cumulative,
+                p.small_customer_revenue,
+                p.total_revenue,
+            )
+            for p in projections
+        ),
+        dtype=PROJECTION_DTYPE,
+        count=len(projections),
+    )
+    return {name: arr[name] for name in PROJECTION_DTYPE.names}
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """
+    Element-wise division that yields 0 wherever the denominator is 0.
+    """
+    return np.divide(numerator, denominator, out=np.zeros(len(numerator)), where=denominator > 0)
+
 
 class ExcelService:
     """
     Generates Excel files matching the original format based on the financial model.
     """
 
+    def __init__(self):
+        # Generated workbooks and their ETags keyed by model_id; stored models never change
+        self._cache: LRUCache = LRUCache(maxsize=EXCEL_CACHE_MAX_BYTES, getsizeof=lambda entry: len(entry[0]))
+        self._cache_lock = threading.Lock()
+
+    def generate_excel_cached(self, model_id: str, model: FinancialModel) -> Tuple[bytes, str]:
+        """
+        Returns the Excel file for a stored model together with its ETag,
+        generating it only on the first request for that model.
+        """
+        with self._cache_lock:
+            entry = self._cache.get(model_id)
+        if entry is None:
+            excel_data = self.generate_excel(model)
+            entry = (excel_data, f'"{hashlib.blake2b(excel_data, digest_size=16).hexdigest()}"')
+            with self._cache_lock:
+                self._cache[model_id] = entry
+        return entry
+
     def generate_excel(self, model: FinancialModel) -> bytes:
         """
         Generates an Excel file from the financial model's projections.
+
+        The workbook is opened in write-only mode, so each row is serialized as
+        soon as it is appended instead of being kept as a tree of cells.
         """
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Financial Model"
-        
+        # openpyxl is slow to import and only needed here, so it is loaded on the first export
+        import openpyxl
+
+        wb = openpyxl.Workbook(write_only=True)
+        header_style, value_style = self._register_styles(wb)
+        ws = wb.create_sheet("Financial Model")
+
+        num_months = len(model.monthly_projections)
+        data_rows = self._build_data_rows(model)
+
+        # Column widths must be set before the first row is written
+        self._apply_styling(ws, data_rows, num_months)
+
         # Create headers
-        self._create_headers(ws, len(model.monthly_projections))
-        
+        self._create_headers(ws, num_months, header_style)
+
         # Populate data
-        self._populate_data(ws, model)
-        
-        # Style the worksheet
-        self._apply_styling(ws)
-        
+        self._populate_data(ws, data_rows, value_style)
+
         # Save to bytes
         output = io.BytesIO()
         wb.save(output)
-        output.seek(0)
         return output.getvalue()
 
-    def _create_headers(self, ws, num_months: int):
+    def _register_styles(self, wb) -> Tuple["StyleArray", "StyleArray"]:
+        """
+        Registers the named styles for header and value cells and returns their
+        resolved style arrays, so each style is looked up once per workbook
+        rather than once per cell.
+        """
+        from openpyxl.styles import NamedStyle
+
+        header_font, header_fill, header_alignment, center = _style_components()
+        header = NamedStyle(name=HEADER_STYLE, font=header_font, fill=header_fill, alignment=header_alignment)
+        value = NamedStyle(name=VALUE_STYLE, alignment=center)
+        wb.add_named_style(header)
+        wb.add_named_style(value)
+        return header.as_tuple(), value.as_tuple()
+
+    def _create_headers(self, ws, num_months: int, style: "StyleArray"):
         """
         Creates the header row for the Excel sheet dynamically based on the number of months.
         """
+        from openpyxl.cell import Cell
+
         headers = ["Metric", "Unit"] + [f"M{i}" for i in range(1, num_months + 1)]
-        
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        
-        for col_num, header_text in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_num, value=header_text)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-
-    def _populate_data(self, ws, model: FinancialModel):
+        ws.append([Cell(ws, value=header_text, style_array=style) for header_text in headers])
+
+    def _build_data_rows(self, model: FinancialModel) -> List[Tuple[str, str, List[Any]]]:
         """
-        Populates data rows matching the original Excel structure.
+        Builds the (metric, unit, values) rows matching the original Excel structure.
         """
-        row = 2
-        
-        # Helper function to write a row of data
-        def write_row(metric_name: str, unit: str, values: List[Any]):
-            nonlocal row
-            ws.cell(row=row, column=1, value=metric_name)
-            ws.cell(row=row, column=2, value=unit)
-            for col, value in enumerate(values, 3):
-                ws.cell(row=row, column=col, value=value)
-            row += 1
-
-        # Extract data from the model's monthly projections
-        projections = model.monthly_projections
-        
+        cols = _projections_to_soa(model.monthly_projections)
+        n = len(model.monthly_projections)
+
+        # Assumptions are constant across months, so look them up once
+        assumptions = model.assumptions
+        large_customers_per_salesperson = assumptions.get("large_customers_per_salesperson", 1.5)
+        cac = assumptions.get("cac", 1500)
+        sales_inquiries = assumptions.get("sales_inquiries_per_month", 160)
+        demo_rate = f"{assumptions.get('demo_rate', 0.45) * 100}%"
+
+        avg_large_revenue = _safe_divide(cols["large_customer_revenue"], cols["large_customers_cumulative"])
+        avg_small_revenue = _safe_divide(cols["small_customer_revenue"], cols["small_customers_cumulative"])
+
         # List of values to be extracted and their corresponding labels
-        data_rows = [
-            ("# of sales people", "#", [p.sales_people for p in projections]),
-            ("# of large customer accounts they can sign per month, sales person", "#", [model.assumptions.get("large_customers_per_salesperson", 1.5) for _ in projections]),
-            ("# of large customer accounts onboarded per month", "#", [p.large_customers_acquired for p in projections]),
-            ("Cumulative # of large paying customers", "#", [p.large_customers_cumulative for p in projections]),
-            ("Average revenue per large customer", "$ per month", [p.large_customer_revenue / p.large_customers_cumulative if p.large_customers_cumulative > 0 else 0 for p in projections]),
-            ("Digital Marketing spend per month", "$ per month", [p.marketing_spend for p in projections]),
-            ("Average CAC", "$ per customer", [model.assumptions.get("cac", 1500) for _ in projections]),
-            ("# of sales inquiries", "#", [model.assumptions.get("sales_inquiries_per_month", 160) for _ in projections]),
-            ("% conversions from demo to sign ups", "%", [f"{model.assumptions.get('demo_rate', 0.45) * 100}%" for _ in projections]),
-            ("# of small/medium paying customers onboarded", "#", [p.small_customers_acquired for p in projections]),
-            ("Cumulative number of small/medium paying customers", "#", [p.small_customers_cumulative for p in projections]),
-            ("Average revenue per small/medium customer", "$ per customer", [p.small_customer_revenue / p.small_customers_cumulative if p.small_customers_cumulative > 0 else 0 for p in projections]),
-            ("Revenue from large clients", "$ per month", [p.large_customer_revenue for p in projections]),
-            ("Revenue from small and medium clients", "$ per month", [p.small_customer_revenue for p in projections]),
-            ("Total Revenues", "$ per month", [p.total_revenue for p in projections]),
-            ("Total Revenues", "$ Mn per month", [round(p.total_revenue / 1000000, 2) for p in projections])
+        return [
+            ("# of sales people", "#", cols["sales_people"].tolist()),
+            ("# of large customer accounts they can sign per month, sales person", "#", [large_customers_per_salesperson] * n),
+            ("# of large customer accounts onboarded per month", "#", cols["large_customers_acquired"].tolist()),
+            ("Cumulative # of large paying customers", "#", cols["large_customers_cumulative"].tolist()),
+            ("Average revenue per large customer", "$ per month", avg_large_revenue.tolist()),
+            ("Digital Marketing spend per month", "$ per month", cols["marketing_spend"].tolist()),
+            ("Average CAC", "$ per customer", [cac] * n),
+            ("# of sales inquiries", "#", [sales_inquiries] * n),
+            ("% conversions from demo to sign ups", "%", [demo_rate] * n),
+            ("# of small/medium paying customers onboarded", "#", cols["small_customers_acquired"].tolist()),
+            ("Cumulative number of small/medium paying customers", "#", cols["small_customers_cumulative"].tolist()),
+            ("Average revenue per small/medium customer", "$ per customer", avg_small_revenue.tolist()),
+            ("Revenue from large clients", "$ per month", cols["large_customer_revenue"].tolist()),
+            ("Revenue from small and medium clients", "$ per month", cols["small_customer_revenue"].tolist()),
+            ("Total Revenues", "$ per month", cols["total_revenue"].tolist()),
+            # Python's round, not np.round: NumPy scales by 100 before rounding, which moves half-cent ties
+            ("Total Revenues", "$ Mn per month", [round(v / 1000000, 2) for v in cols["total_revenue"].tolist()])
         ]
-        
+
+    def _populate_data(self, ws, data_rows: List[Tuple[str, str, List[Any]]], style: "StyleArray"):
+        """
+        Appends one worksheet row per metric, with the monthly values centered.
+        """
+        from openpyxl.cell import Cell
+
         for metric, unit, values in data_rows:
-            write_row(metric, unit, values)
+            row: List[Any] = [None] * (len(values) + 2)
+            row[0] = metric
+            row[1] = unit
+            for col, value in enumerate(values, 2):
+                row[col] = Cell(ws, value=value, style_array=style)
+            ws.append(row)
 
-    def _apply_styling(self, ws):
+    def _apply_styling(self, ws, data_rows: List[Tuple[str, str, List[Any]]], num_months: int):
         """
-        Applies basic styling to match the original Excel format.
+        Sets column widths from the known metric names and units.
         """
-        # Auto-adjust column widths
-        for col in ws.columns:
-            max_length = 0
-            column = col[0].column_letter
-            for cell in col:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = max_length + 2
-            ws.column_dimensions[column].width = min(adjusted_width, 50)
-            
-        # Center align numeric data
-        for row in ws.iter_rows(min_row=2, min_col=3):
-            for cell in row:
-                cell.alignment = Alignment(horizontal="center")
+        from openpyxl.utils import get_column_letter
+
+        metric_width = max(len("Metric"), *(len(metric) for metric, _, _ in data_rows))
+        unit_width = max(len("Unit"), *(len(unit) for _, unit, _ in data_rows))
+        ws.column_dimensions["A"].width = min(metric_width + 2, MAX_COLUMN_WIDTH)
+        ws.column_dimensions["B"].width = min(unit_width + 2, MAX_COLUMN_WIDTH)
+        for col in range(3, num_months + 3):
+            ws.column_dimensions[get_column_letter(col)].width = VALUE_COLUMN_WIDTH
@@ -1,15 +1,25 @@
 import uuid
+import threading
+import anyio
+from functools import partial
 from typing import Dict, Any, List, Optional
+from cachetools import TTLCache
 from app.models.response_models import QueryResponse
 from app.models.finance_models import FinancialModelData, MonthlyProjection, RevenueDriver
 from app.services.llm_service import LLMService
 from app.utils.formula_engine import FormulaEngine
 
+# Generated models are kept for export for a limited time and up to a fixed count
+MODEL_CACHE_MAXSIZE = 1024
+MODEL_TTL_SECONDS = 3600
+
 class FinanceService:
     def __init__(self):
         self.llm_service = LLMService()
         self.formula_engine = FormulaEngine()
-        self.models: Dict[str, FinancialModelData] = {}
+        self.models: TTLCache = TTLCache(maxsize=MODEL_CACHE_MAXSIZE, ttl=MODEL_TTL_SECONDS)
+        # Models are read from threadpool handlers, and TTLCache is not thread-safe
+        self._models_lock = threading.Lock()
 
     async def process_query(self, user_query: str) -> QueryResponse:
         """
@@ -59,12 +69,13 @@ class FinanceService:
         # Convert raw data to Pydantic models
         revenue_drivers = [RevenueDriver(**rd) for rd in revenue_drivers_data]
 
-        # Calculate projections
-        projections = self.formula_engine.calculate_monthly_projections(
+        # Calculate projections in a worker thread so the event loop keeps serving other requests
+        projections = await anyio.to_thread.run_sync(partial(
+            self.formula_engine.calculate_monthly_projections,
             time_horizon=time_horizon,
             assumptions=assumptions,
             revenue_drivers=revenue_drivers
-        )
+        ))
 
         # Create a new financial model object
         model_id = str(uuid.uuid4())
@@ -75,7 +86,8 @@ class FinanceService:
             revenue_drivers=revenue_drivers,
             monthly_projections=projections
         )
-        self.models[model_id] = financial_model
+        with self._models_lock:
+            self.models[model_id] = financial_model
 
         return QueryResponse(
             model_id=model_id,
@@ -92,9 +104,10 @@ class FinanceService:
             model_id (str): The unique ID of the financial model.
             
         Returns:
-            FinancialModelData: The financial model object.
+            FinancialModelData: The financial model object, or None if it is unknown or has expired.
         """
-        return self.models.get(model_id)
+        with self._models_lock:
+            return self.models.get(model_id)
 
     def get_available_revenue_drivers(self) -> Dict[str, Any]:
         """
@@ -1,17 +1,93 @@
+import copy
+import hashlib
 import json
-import os
-from typing import Dict, Any
-import google.generativeai as genai
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Any
+import anyio
+from cachetools import LRUCache
 from app.config.settings import get_settings
 
+if TYPE_CHECKING:
+    import google.generativeai as genai
+
 settings = get_settings()
-# Configure the API key from a more secure location (e.g., environment variables)
-genai.configure(api_key=os.environ.get("GOOGLE_API_KEY"))
+
+# Patterns used by the offline query parser, compiled once at import
+# months: e.g., "12-month", "12 months"
+_MONTHS_RE = re.compile(r'(\d+)\s*[- ]*\s*month')
+# sales people: e.g., "2 sales people", "2 salespeople", "2 sales"
+_SALES_RE = re.compile(r'(\d+)\s*(sales\s*people|salespeople|sales)')
+# marketing spend: "$200k marketing", "200k marketing budget", "$1.2m marketing"
+_MARKETING_RE = re.compile(r'\$?([\d.,]+)\s*(k|m|million|thousand)?\s*(marketing|ad|advertis|budget|spend)')
+# conversion rate: "45% conversion" or "... at 0.45 conversion"
+_CONV_PCT_RE = re.compile(r'([\d.]+)\s*%\s*(conversion|conv)')
+_CONV_FRAC_RE = re.compile(r'\b(0\.[\d]+)\b\s*(conversion|conv)')
+
+MODEL_NAME = "gemini-2.5-flash-preview-05-20"
+
+# Generation config for the LLM. The JSON schema makes the LLM return a
+# structured, predictable response that the application can easily parse.
+GENERATION_CONFIG: Dict[str, Any] = {
+    "response_mime_type": "application/json",
+    "response_schema": {
+        "type": "OBJECT",
+        "properties": {
+            "time_horizon_months": {"type": "NUMBER"},
+            "revenue_drivers": {
+                "type": "ARRAY",
+                "items": {
+                    "type": "OBJECT",
+                    "properties": {
+                        "name": {"type": "STRING"},
+                        "type": {"type": "STRING"},
+                        "value": {"type": "NUMBER"},
+                        "unit": {"type": "STRING"}
+                    }
+                }
+            },
+            "assumptions": {
+                "type": "OBJECT",
+                "properties": {
+                    "initial_sales_people": {"type": "NUMBER"},
+                    "sales_people_growth_monthly": {"type": "NUMBER"},
+                    "customers_per_salesperson_per_month": {"type": "NUMBER"},
+                    "revenue_per_large_customer": {"type": "NUMBER"},
+                    "monthly_marketing_spend": {"type": "NUMBER"},
+                    "sales_inquiries_per_month": {"type": "NUMBER"},
+                    "demo_rate": {"type": "NUMBER"},
+                    "avg_revenue_per_small_customer": {"type": "NUMBER"}
+                }
+            },
+            "business_focus": {
+                "type": "ARRAY",
+                "items": {"type": "STRING"}
+            },
+            "special_instructions": {
+                "type": "ARRAY",
+                "items": {"type": "STRING"}
+            }
+        }
+    }
+}
+
+# Number of distinct queries whose parsed LLM response is kept in memory
+LLM_CACHE_MAXSIZE = 256
+
+@lru_cache(maxsize=1)
+def _load_genai():
+    """
+    Imports and configures google.generativeai on first use. The SDK takes about
+    half a second to import and is never needed when no API key is set.
+    """
+    import google.generativeai as genai
+    # Configure the API key from settings (loaded from the environment or .env)
+    genai.configure(api_key=settings.google_api_key)
+    return genai
 
 class LLMService:
 
     def _parse_query(self, user_query: str):
-        import re
         text = user_query.lower()
         def to_number(val, unit=None):
             try:
@@ -26,27 +102,23 @@ class LLMService:
 
         res = {}
 
-        # months: e.g., "12-month", "12 months"
-        m = re.search(r'(\d+)\s*[- ]*\s*month', text)
+        m = _MONTHS_RE.search(text)
         if m:
             res['months'] = int(m.group(1))
 
-        # sales people: e.g., "2 sales people", "2 salespeople", "2 sales"
-        m = re.search(r'(\d+)\s*(sales\s*people|salespeople|sales)', text)
+        m = _SALES_RE.search(text)
         if m:
             res['sales_people'] = int(m.group(1))
 
-        # marketing spend: "$200k marketing", "200k marketing budget", "$1.2m marketing"
-        m = re.search(r'\$?([\d.,]+)\s*(k|m|million|thousand)?\s*(marketing|ad|advertis|budget|spend)', text)
+        m = _MARKETING_RE.search(text)
         if m:
             res['marketing'] = to_number(m.group(1), m.group(2).lower() if m.group(2) else None)
 
-        # conversion rate: "45% conversion" or "... at 0.45 conversion"
-        m = re.search(r'([\d.]+)\s*%\s*(conversion|conv)', text)
+        m = _CONV_PCT_RE.search(text)
         if m:
             res['conversion'] = float(m.group(1)) / 100.0
         else:
-            m = re.search(r'(0\.[\d]+)\s*(conversion|conv)', text)
+            m = _CONV_FRAC_RE.search(text)
             if m:
                 res['conversion'] = float(m.group(1))
 
@@ -65,55 +137,72 @@ class LLMService:
             "just use the number without the '%' sign."
         )
 
-    def _get_generation_config(self) -> Dict[str, Any]:
+        # Built on first use and shared by every request
+        self._model = None
+        # The SDK's shared async client, once created, so shutdown knows whether there is a channel to close
+        self._async_client = None
+
+        # Parsed LLM responses keyed by a hash of the normalized query
+        self._cache: LRUCache = LRUCache(maxsize=LLM_CACHE_MAXSIZE)
+
+    def _get_model(self) -> "genai.GenerativeModel":
         """
-        Returns a generation configuration for the LLM.
-        
-        This config uses a JSON schema to ensure the LLM returns a structured,
-        predictable response that the application can easily parse.
+        Returns the Gemini model, creating it once with the system instruction
+        and generation config so it is not rebuilt per request.
         """
-        return {
-            "response_mime_type": "application/json",
-            "response_schema": {
-                "type": "OBJECT",
-                "properties": {
-                    "time_horizon_months": {"type": "NUMBER"},
-                    "revenue_drivers": {
-                        "type": "ARRAY",
-                        "items": {
-                            "type": "OBJECT",
-                            "properties": {
-                                "name": {"type": "STRING"},
-                                "type": {"type": "STRING"},
-                                "value": {"type": "NUMBER"},
-                                "unit": {"type": "STRING"}
-                            }
-                        }
-                    },
-                    "assumptions": {
-                        "type": "OBJECT",
-                        "properties": {
-                            "initial_sales_people": {"type": "NUMBER"},
-                            "sales_people_growth_monthly": {"type": "NUMBER"},
-                            "customers_per_salesperson_per_month": {"type": "NUMBER"},
-                            "revenue_per_large_customer": {"type": "NUMBER"},
-                            "monthly_marketing_spend": {"type": "NUMBER"},
-                            "sales_inquiries_per_month": {"type": "NUMBER"},
-                            "demo_rate": {"type": "NUMBER"},
-                            "avg_revenue_per_small_customer": {"type": "NUMBER"}
-                        }
-                    },
-                    "business_focus": {
-                        "type": "ARRAY",
-                        "items": {"type": "STRING"}
-                    },
-                    "special_instructions": {
-                        "type": "ARRAY",
-                        "items": {"type": "STRING"}
-                    }
-                }
-            }
-        }
+        if self._model is None:
+            self._model = _load_genai().GenerativeModel(
+                model_name=MODEL_NAME,
+                system_instruction=self.system_instruction,
+                generation_config=GENERATION_CONFIG
+            )
+        return self._model
+
+    def _ensure_async_client(self):
+        """
+        Creates the SDK's shared async client on first use and records it. The
+        model uses the same process-wide client, so this is the one to close.
+        """
+        if self._async_client is None:
+            from google.generativeai import client as genai_client
+            self._async_client = genai_client.get_default_generative_async_client()
+        return self._async_client
+
+    async def connect(self):
+        """
+        Imports the SDK in a worker thread, then creates the model and the SDK's
+        shared async client, so the first query does not pay for either. Every later
+        call reuses that gRPC channel. Must be awaited on the running event loop.
+        """
+        if not settings.google_api_key:
+            return
+        try:
+            await anyio.to_thread.run_sync(_load_genai)
+            self._get_model()
+            self._ensure_async_client()
+        except Exception:
+            # Warm-up is best effort; the first query retries and falls back if the SDK is unusable
+            pass
+
+    async def aclose(self):
+        """
+        Closes the shared async client's gRPC channel on application shutdown.
+        Does nothing if the client was never created.
+        """
+        client, self._async_client = self._async_client, None
+        if client is None:
+            return
+        # The model and the SDK both keep the client; forget it in both places so a later
+        # connect() in this process (uvicorn reload, a new TestClient) opens a fresh channel
+        self._model = None
+        from google.generativeai import client as genai_client
+        if genai_client._client_manager.clients.get("generative_async") is client:
+            del genai_client._client_manager.clients["generative_async"]
+        try:
+            await client.transport.close()
+        except Exception:
+            # Closing is best effort; a failed close must not break the rest of shutdown
+            pass
 
     async def get_financial_model_from_query(self, user_query: str) -> Dict[str, Any]:
         """
@@ -126,26 +215,27 @@ class LLMService:
             Dict[str, Any]: A dictionary containing the structured financial data.
         """
         try:
-            api_key = os.environ.get("GOOGLE_API_KEY")
-            if not api_key:
+            if not settings.google_api_key:
                 # Fallback when API key is not provided
                 return self._fallback_response(user_query)
 
-            model = genai.GenerativeModel(
-                model_name="gemini-2.5-flash-preview-05-20",
-                system_instruction=self.system_instruction
-            )
-            
-            response = await model.generate_content_async(
-                user_query,
-                generation_config=self._get_generation_config()
-            )
+            # Identical queries reuse the earlier answer instead of another LLM round-trip
+            cache_key = hashlib.sha1(user_query.strip().lower().encode()).hexdigest()
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return copy.deepcopy(cached)
+
+            model = self._get_model()
+            self._ensure_async_client()
+            response = await model.generate_content_async(user_query)
 
             # Extract the text content from the response
             response_text = response.candidates[0].content.parts[0].text
             
             # Parse the JSON string into a Python dictionary
-            return json.loads(response_text)
+            result = json.loads(response_text)
+            self._cache[cache_key] = result
+            return copy.deepcopy(result)
             
         except Exception:
             # Graceful fallback on any LLM error
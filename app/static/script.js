@@ -23,26 +23,15 @@ async function handleQuerySubmit(e) {
     const formData = new FormData(queryForm);
     const query = formData.get('query');
     
-    // Build query parameters
-    const params = new URLSearchParams();
-    params.append('query', query);
-    
-    // Add optional parameters if provided
-    const months = formData.get('months');
-    const initialSalesPeople = formData.get('initialSalesPeople');
-    const marketingSpend = formData.get('marketingSpend');
-    const largeCustomerRevenue = formData.get('largeCustomerRevenue');
-    
-    if (months) params.append('months', months);
-    if (initialSalesPeople) params.append('initial_sales_people', initialSalesPeople);
-    if (marketingSpend) params.append('marketing_spend_monthly', marketingSpend);
-    if (largeCustomerRevenue) params.append('large_customer_revenue_monthly', largeCustomerRevenue);
-    
     // Show loading state
     showLoading();
     
     try {
-        const response = await fetch(`${API_BASE}/api/v1/search?${params}`);
+        const response = await fetch(`${API_BASE}/api/v1/search`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ user_query: query })
+        });
         
         if (!response.ok) {
             const errorData = await response.json();
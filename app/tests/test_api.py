@@ -13,7 +13,7 @@ def test_health_check():
 def test_search_financial_model():
     """Test creating a financial model with a natural language query"""
     query = "Create 12-month revenue forecast with 2 sales people"
-    response = client.get(f"/api/v1/search?query={query}")
+    response = client.post("/api/v1/search", json={"user_query": query})
     assert response.status_code == 200
     data = response.json()
     assert "model_id" in data
@@ -34,10 +34,28 @@ async def test_excel_export():
     """Test the Excel export functionality"""
     # First create a model
     query = "Create revenue forecast"
-    response = client.get(f"/api/v1/search?query={query}")
+    response = client.post("/api/v1/search", json={"user_query": query})
     model_id = response.json()["model_id"]
 
     # Then export to Excel
     export_response = client.get(f"/api/v1/export/excel/{model_id}")
     assert export_response.status_code == 200
     assert export_response.headers["content-type"] == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+def test_excel_export_etag():
+    """Test that a repeated Excel export with a matching ETag returns 304"""
+    response = client.post("/api/v1/search", json={"user_query": "Create revenue forecast"})
+    model_id = response.json()["model_id"]
+
+    first = client.get(f"/api/v1/export/excel/{model_id}")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    second = client.get(f"/api/v1/export/excel/{model_id}", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.headers["etag"] == etag
+
+def test_excel_export_unknown_model():
+    """Test that exporting an unknown or expired model returns 404"""
+    response = client.get("/api/v1/export/excel/does-not-exist")
+    assert response.status_code == 404
@@ -1,5 +1,6 @@
 import pytest
 from app.services.finance_service import FinanceService
+from app.services.llm_service import LLMService
 from app.utils.formula_engine import FormulaEngine
 
 @pytest.mark.asyncio
@@ -40,3 +41,90 @@ def test_formula_engine():
     # Check revenue calculations
     assert projections[0].total_revenue > 0
     assert projections[2].total_revenue > projections[0].total_revenue
+
+def test_formula_engine_cumulative_values():
+    """Test cumulative customers and revenue produced by the vectorized projection."""
+    engine = FormulaEngine()
+    assumptions = {
+        "initial_sales_people": 2,
+        "sales_people_growth_rate": 1,
+        "large_customer_revenue_monthly": 16667,
+        "small_customer_revenue_monthly": 5000,
+    }
+
+    projections = engine.calculate_monthly_projections(3, assumptions, [])
+
+    assert [p.large_customers_acquired for p in projections] == [3, 4, 6]
+    assert [p.large_customers_cumulative for p in projections] == [3, 7, 13]
+    assert [p.small_customers_acquired for p in projections] == [72, 72, 72]
+    assert [p.small_customers_cumulative for p in projections] == [72, 144, 216]
+    assert [p.total_revenue for p in projections] == [410001, 836669, 1296671]
+
+def test_formula_engine_float_headcounts():
+    """Test that whole-number float headcounts from the LLM produce int projections."""
+    engine = FormulaEngine()
+    assumptions = {"initial_sales_people": 2.0, "sales_people_growth_rate": 1.0}
+
+    projections = engine.calculate_monthly_projections(3, assumptions, [])
+
+    assert [p.sales_people for p in projections] == [2, 3, 4]
+    assert all(type(p.sales_people) is int for p in projections)
+    assert '"sales_people":2,' in projections[0].model_dump_json(warnings="error")
+
+    with pytest.raises(ValueError):
+        engine.calculate_monthly_projections(3, {"sales_people_growth_rate": 0.5}, [])
+
+def test_formula_engine_projection_columns():
+    """Test that the columnar projection matches the per-month objects."""
+    engine = FormulaEngine()
+    assumptions = {"initial_sales_people": 2, "sales_people_growth_rate": 1}
+
+    columns = engine.calculate_projection_columns(6, assumptions)
+    projections = engine.calculate_monthly_projections(6, assumptions, [])
+
+    assert list(columns["month"]) == [1, 2, 3, 4, 5, 6]
+    for name, values in columns.items():
+        assert values.tolist() == [getattr(p, name) for p in projections]
+
+def test_formula_engine_calculate_many():
+    """Test that a batched scenario sweep matches one projection per scenario."""
+    engine = FormulaEngine()
+    assumption_sets = [
+        {"initial_sales_people": 2, "sales_people_growth_rate": 1},
+        {"initial_sales_people": 5, "conversion_rate": 0.3},
+        {},
+    ]
+
+    columns = engine.calculate_many(4, assumption_sets)
+
+    for i, assumptions in enumerate(assumption_sets):
+        single = engine.calculate_projection_columns(4, assumptions)
+        for name, values in single.items():
+            assert columns[name].shape == (3, 4)
+            assert columns[name][i].tolist() == values.tolist()
+
+def test_formula_engine_calculate_many_empty():
+    """Test that an empty scenario sweep returns empty columns for the horizon."""
+    columns = FormulaEngine().calculate_many(3, [])
+
+    for values in columns.values():
+        assert values.shape == (0, 3)
+
+def test_formula_engine_projections_df():
+    """Test that the DataFrame projection has one row per month and matches the objects."""
+    engine = FormulaEngine()
+    assumptions = {"initial_sales_people": 2, "sales_people_growth_rate": 1}
+
+    df = engine.calculate_monthly_projections_df(5, assumptions)
+    projections = engine.calculate_monthly_projections(5, assumptions, [])
+
+    assert len(df) == 5
+    assert df.to_dict("records") == [p.model_dump() for p in projections]
+
+def test_llm_parse_query_conversion():
+    """Test that the offline parser reads conversion rates as fractions and as percentages."""
+    service = LLMService()
+
+    assert service._parse_query("12-month forecast at 0.3 conversion")["conversion"] == 0.3
+    assert service._parse_query("12-month forecast with 45% conversion")["conversion"] == 0.45
+    assert "conversion" not in service._parse_query("12-month forecast with 2 sales people")
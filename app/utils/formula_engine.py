@@ -1,7 +1,194 @@
-import math
-from typing import Dict, Any, List
+import numpy as np
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Any, List, Tuple
 from app.models.finance_models import MonthlyProjection, RevenueDriver
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Order of the arrays returned by _project_kernel
+PROJECTION_FIELDS = (
+    "month",
+    "sales_people",
+    "large_customers_acquired",
+    "large_customers_cumulative",
+    "large_customer_revenue",
+    "small_customers_acquired",
+    "small_customers_cumulative",
+    "small_customer_revenue",
+    "marketing_spend",
+    "total_revenue",
+)
+
+
+def _resolve_horizon(time_horizon: int) -> int:
+    """
+    Falls back to 11 months when the horizon is missing or not a positive integer.
+    """
+    if not isinstance(time_horizon, int) or time_horizon <= 0:
+        return 11
+    return time_horizon
+
+
+def _whole_headcount(name: str, value: Any) -> int:
+    """
+    Returns a headcount input as an int. The LLM schema types every assumption as
+    a number, so whole floats such as 2.0 are accepted; fractional people are not.
+    """
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"{name} must be a whole number of people, got {value}")
+        return int(value)
+    return value
+
+
+@dataclass(frozen=True)
+class _Assumptions:
+    """
+    Projection inputs resolved from an assumptions dict, with defaults applied.
+    Fields are declared in _project_kernel argument order. Headcounts are ints;
+    money is kept as given.
+    """
+    time_horizon: int
+    initial_sales_people: int
+    sales_people_growth_rate: int
+    large_customer_revenue_monthly: float
+    small_customer_revenue_monthly: float
+    marketing_spend_monthly: float
+    new_smb_customers: int
+
+
+def _validate_and_extract(assumptions: Dict[str, Any], time_horizon: int) -> _Assumptions:
+    """
+    Validates the horizon and resolves the assumptions dict once, so the kernel
+    only receives plain numbers. Headcounts are normalized to ints, which the
+    integer intake arithmetic in _project_columns relies on.
+
+    Sales inquiries and the conversion rate are counts and a ratio, so they are
+    assumed non-negative; the SMB intake is truncated with int() on that basis.
+    """
+    # Extracting key assumptions with default values to prevent NoneType errors
+    initial_sales_people = _whole_headcount("initial_sales_people", assumptions.get("initial_sales_people", 1))
+    sales_people_growth_rate = _whole_headcount(
+        "sales_people_growth_rate", assumptions.get("sales_people_growth_rate", 0)  # Changed to 0
+    )
+
+    # Default revenue assumptions
+    large_customer_revenue_monthly = assumptions.get("large_customer_revenue_monthly", 16667)
+    small_customer_revenue_monthly = assumptions.get("small_customer_revenue_monthly", 5000)
+
+    # Default cost assumptions
+    marketing_spend_monthly = assumptions.get("marketing_spend_monthly", 200000)
+
+    # Marketing-driven customer acquisition
+    sales_inquiries = assumptions.get("sales_inquiries_per_month", 160)
+    conversion_rate = assumptions.get("conversion_rate", 0.45)
+
+    # The same number of small/medium customers is onboarded every month
+    # Both factors are non-negative, so truncation equals floor
+    new_smb_customers = int(sales_inquiries * conversion_rate)
+
+    return _Assumptions(
+        time_horizon=_resolve_horizon(time_horizon),
+        initial_sales_people=initial_sales_people,
+        sales_people_growth_rate=sales_people_growth_rate,
+        large_customer_revenue_monthly=large_customer_revenue_monthly,
+        small_customer_revenue_monthly=small_customer_revenue_monthly,
+        marketing_spend_monthly=marketing_spend_monthly,
+        new_smb_customers=new_smb_customers,
+    )
+
+
+def _project_columns(
+    months: np.ndarray,
+    initial_sales_people,
+    sales_people_growth_rate,
+    large_customer_revenue_monthly,
+    small_customer_revenue_monthly,
+    marketing_spend_monthly,
+    new_smb_customers
+) -> Tuple[np.ndarray, ...]:
+    """
+    Projection arithmetic, in PROJECTION_FIELDS order. Scalar inputs give one
+    (horizon,) array per metric; (N, 1) arrays give (N, horizon) arrays with one
+    row per scenario.
+
+    Counts are kept as int64 arrays (months is int64 on every platform, so counts
+    derived from it are too) and money as float64; float32 would lose whole
+    dollars once cumulative revenue passes ~16.7M.
+    """
+    # Salespeople and customer calculations for 'large customers'
+    sales_people = initial_sales_people + sales_people_growth_rate * (months - 1)
+    # Headcounts are whole, so floor(x * 1.5) is exactly (3x) >> 1, without a round trip through float
+    large_acquired = (sales_people * 3) >> 1
+    # Not an arithmetic series: the floor drops half a customer for every odd headcount
+    large_cumulative = np.cumsum(large_acquired, axis=-1, dtype=np.int64)
+    large_revenue = large_cumulative * large_customer_revenue_monthly
+
+    # Marketing and customer calculations for 'small/medium customers'
+    # The same number is onboarded every month, so the cumulative count is closed-form
+    small_cumulative = new_smb_customers * months
+    small_acquired = np.full(small_cumulative.shape, new_smb_customers, dtype=np.int64)
+    small_revenue = small_cumulative * small_customer_revenue_monthly
+
+    return (
+        np.broadcast_to(months, large_revenue.shape),
+        sales_people,
+        large_acquired,
+        large_cumulative,
+        large_revenue,
+        small_acquired,
+        small_cumulative,
+        small_revenue,
+        # Constant spend: a read-only view of the one value rather than a filled array
+        np.broadcast_to(marketing_spend_monthly, small_cumulative.shape),
+        large_revenue + small_revenue,
+    )
+
+
+def _read_only(columns: Tuple[np.ndarray, ...]) -> Tuple[np.ndarray, ...]:
+    """
+    Marks every projection column read-only. Month and marketing spend are
+    broadcast views, which NumPy never lets callers write to, so the other
+    columns follow suit and every public API returns uniformly read-only arrays.
+    """
+    for column in columns:
+        column.flags.writeable = False
+    return columns
+
+
+# Results are cached per distinct scalar input. typed=True keeps money inputs such as 16667 and 16667.0
+# apart, so the dtype of a cached revenue column always follows the inputs of the call that reads it
+@lru_cache(maxsize=128, typed=True)
+def _project_kernel(
+    time_horizon: int,
+    initial_sales_people: int,
+    sales_people_growth_rate: int,
+    large_customer_revenue_monthly: float,
+    small_customer_revenue_monthly: float,
+    marketing_spend_monthly: float,
+    new_smb_customers: int
+) -> Tuple[np.ndarray, ...]:
+    """
+    Numeric core of the projection: takes only scalars and returns one array per
+    metric, in PROJECTION_FIELDS order.
+
+    The kernel is a pure function, so results are memoized. The returned arrays
+    are shared between callers and therefore read-only.
+    """
+    columns = _project_columns(
+        np.arange(1, time_horizon + 1, dtype=np.int64),
+        initial_sales_people,
+        sales_people_growth_rate,
+        large_customer_revenue_monthly,
+        small_customer_revenue_monthly,
+        marketing_spend_monthly,
+        new_smb_customers
+    )
+    return _read_only(columns)
+
 
 class FormulaEngine:
     """
@@ -20,66 +207,97 @@ class FormulaEngine:
         Returns:
             List[MonthlyProjection]: A list of monthly projection objects.
         """
-        projections: List[MonthlyProjection] = []
-
-        # Extracting key assumptions with default values to prevent NoneType errors
-        initial_sales_people = assumptions.get("initial_sales_people", 1)
-        sales_people_growth_rate = assumptions.get("sales_people_growth_rate", 0)  # Changed to 0
-        
-        # Default revenue assumptions
-        large_customer_revenue_monthly = assumptions.get("large_customer_revenue_monthly", 16667)
-        small_customer_revenue_monthly = assumptions.get("small_customer_revenue_monthly", 5000)
-
-        # Default cost assumptions
-        marketing_spend_monthly = assumptions.get("marketing_spend_monthly", 200000)
-
-        # Initialize month 0 values
-        current_sales_people = initial_sales_people
-
-        # Guard against None or invalid horizon
-        if not isinstance(time_horizon, int) or time_horizon <= 0:
-            time_horizon = 11
-
-        # Tracking cumulative customers
-        cumulative_large_customers = 0
-        cumulative_small_customers = 0
-
-        # Monthly loop for projections
-        for month in range(1, time_horizon + 1):
-            # Salespeople and customer calculations for 'large customers'
-            new_large_customers = math.floor(current_sales_people * 1.5)
-            cumulative_large_customers += new_large_customers
-            large_customer_revenue = cumulative_large_customers * large_customer_revenue_monthly
-
-            # Marketing and customer calculations for 'small/medium customers'
-            marketing_cost = marketing_spend_monthly
-            
-            # Use marketing-driven customer acquisition
-            sales_inquiries = assumptions.get("sales_inquiries_per_month", 160)
-            conversion_rate = assumptions.get("conversion_rate", 0.45)
-            new_smb_customers = math.floor(sales_inquiries * conversion_rate)
-            cumulative_small_customers += new_smb_customers
-            smb_customer_revenue = cumulative_small_customers * small_customer_revenue_monthly
-            
-            # Total Revenue Calculation
-            total_revenue = large_customer_revenue + smb_customer_revenue
-
-            # Create the monthly projection object
-            projection = MonthlyProjection(
+        columns = self.calculate_projection_columns(time_horizon, assumptions)
+
+        # Materialize the response objects only at the end, from plain Python values
+        return [
+            MonthlyProjection(
                 month=month,
-                sales_people=current_sales_people,
-                large_customers_acquired=new_large_customers,
-                large_customers_cumulative=cumulative_large_customers,
-                large_customer_revenue=large_customer_revenue,
-                small_customers_acquired=new_smb_customers,
-                small_customers_cumulative=cumulative_small_customers,
-                small_customer_revenue=smb_customer_revenue,
-                marketing_spend=marketing_cost,
+                sales_people=sales_people,
+                large_customers_acquired=large_acquired,
+                large_customers_cumulative=large_cumulative,
+                large_customer_revenue=large_revenue,
+                small_customers_acquired=small_acquired,
+                small_customers_cumulative=small_cumulative,
+                small_customer_revenue=small_revenue,
+                marketing_spend=marketing_spend,
                 total_revenue=total_revenue
             )
-            projections.append(projection)
+            for (
+                month, sales_people, large_acquired, large_cumulative, large_revenue,
+                small_acquired, small_cumulative, small_revenue, marketing_spend, total_revenue
+            ) in zip(*(column.tolist() for column in columns.values()))
+        ]
+
+    def calculate_projection_columns(self, time_horizon: int, assumptions: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Calculates the same projections as calculate_monthly_projections, laid out as
+        one NumPy array per field (struct of arrays) for callers that aggregate or
+        plot and do not need per-month objects.
+
+        Args:
+            time_horizon (int): The number of months to project.
+            assumptions (Dict[str, Any]): A dictionary of key assumptions.
+
+        Returns:
+            Dict[str, np.ndarray]: Read-only arrays keyed by MonthlyProjection field name, in PROJECTION_FIELDS order.
+        """
+        inputs = _validate_and_extract(assumptions, time_horizon)
+        return dict(zip(PROJECTION_FIELDS, _project_kernel(
+            inputs.time_horizon,
+            inputs.initial_sales_people,
+            inputs.sales_people_growth_rate,
+            inputs.large_customer_revenue_monthly,
+            inputs.small_customer_revenue_monthly,
+            inputs.marketing_spend_monthly,
+            inputs.new_smb_customers
+        )))
+
+    def calculate_monthly_projections_df(self, time_horizon: int, assumptions: Dict[str, Any]) -> "pd.DataFrame":
+        """
+        Calculates the same projections as calculate_monthly_projections as a pandas
+        DataFrame with one row per month, for aggregation, plotting or CSV export.
+
+        Args:
+            time_horizon (int): The number of months to project.
+            assumptions (Dict[str, Any]): A dictionary of key assumptions.
+
+        Returns:
+            pd.DataFrame: One column per MonthlyProjection field, in PROJECTION_FIELDS order.
+        """
+        # pandas is slow to import and only needed by analytics callers, so it is loaded here
+        import pandas as pd
+
+        # The DataFrame copies the shared read-only arrays, so callers may modify it freely
+        return pd.DataFrame(self.calculate_projection_columns(time_horizon, assumptions))
+
+    def calculate_many(self, time_horizon: int, assumption_sets: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """
+        Calculates the projection columns for many assumption sets at once, for
+        sensitivity analyses and scenario sweeps. All scenarios are computed in a
+        single vectorized pass rather than one call per scenario.
+
+        Args:
+            time_horizon (int): The number of months to project, shared by every scenario.
+            assumption_sets (List[Dict[str, Any]]): One assumptions dictionary per scenario.
+
+        Returns:
+            Dict[str, np.ndarray]: Read-only arrays of shape (len(assumption_sets), time_horizon) keyed
+            by MonthlyProjection field name; row i holds the projection for assumption_sets[i].
+        """
+        time_horizon = _resolve_horizon(time_horizon)
+        scenarios = [_validate_and_extract(assumptions, time_horizon) for assumptions in assumption_sets]
 
-            # Update state for next month
-            current_sales_people += sales_people_growth_rate
+        # One (N, 1) column per kernel argument after the horizon, so it broadcasts against the months axis.
+        # Integer fields get an explicit dtype so an empty sweep still reaches the integer arithmetic as int64
+        inputs = [
+            np.array(
+                [getattr(scenario, field.name) for scenario in scenarios],
+                dtype=np.int64 if field.type is int else None
+            ).reshape(-1, 1)
+            for field in fields(_Assumptions)[1:]
+        ]
 
-        return projections
+        return dict(zip(PROJECTION_FIELDS, _read_only(
+            _project_columns(np.arange(1, time_horizon + 1, dtype=np.int64), *inputs)
+        )))
@@ -1,21 +1,37 @@
-import json
 import os
-from typing import Dict, Any
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, Optional
+import orjson
+
+@lru_cache(maxsize=1)
+def _read_saas_rules_file() -> Optional[Dict[str, Any]]:
+    """Read and parse the rules file once per process; None if it does not exist"""
+    try:
+        file_path = os.path.join(os.path.dirname(__file__), "data", "knowledge_base.json")
+        return orjson.loads(Path(file_path).read_bytes())
+    except FileNotFoundError:
+        return None
 
 class KnowledgeBase:
     """Manages SaaS company business rules and logic"""
     
     def __init__(self):
-        self.saas_rules = self._load_saas_rules()
+        # Loaded on first access, so constructing a KnowledgeBase does no file I/O
+        self._saas_rules: Optional[Dict[str, Any]] = None
+
+    @property
+    def saas_rules(self) -> Dict[str, Any]:
+        if self._saas_rules is None:
+            self._saas_rules = self._load_saas_rules()
+        return self._saas_rules
     
     def _load_saas_rules(self) -> Dict[str, Any]:
-        """Load SaaS company rules from JSON file"""
-        try:
-            file_path = os.path.join(os.path.dirname(__file__), "data", "knowledge_base.json")
-            with open(file_path, 'r') as file:
-                return json.load(file)
-        except FileNotFoundError:
+        """Load SaaS company rules from JSON file (shared by all instances)"""
+        rules = _read_saas_rules_file()
+        if rules is None:
             return self._get_default_saas_rules()
+        return rules
     
     def get_saas_rules(self) -> Dict[str, Any]:
         """Get SaaS company business rules"""
@@ -59,7 +59,11 @@ class FinancialApp {
         this.hideError();
         
         try {
-            const response = await fetch(`${this.API_BASE}/api/v1/search?query=${encodeURIComponent(query)}`);
+            const response = await fetch(`${this.API_BASE}/api/v1/search`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ user_query: query })
+            });
             
             if (!response.ok) {
                 const errorData = await response.json();